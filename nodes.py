@@ -4,20 +4,53 @@ ComfyUI Custom Node: Spectrum Notch Filter
 출력: 주기적 노이즈 피크가 마스킹된 스펙트럼 이미지
 """
 
+import functools
 import json
 import os
 import tempfile
 
 import numpy as np
 import torch
+import torch.nn.functional as F
 from PIL import Image
-from scipy.ndimage import gaussian_filter, maximum_filter
+from scipy.ndimage import gaussian_filter1d, maximum_filter1d
+
+# numba는 선택 의존성 – 있으면 마스크 페인팅/적용을 병렬 JIT 커널로 처리
+try:
+    import numba
+    _HAS_NUMBA = True
+except ImportError:
+    numba = None
+    _HAS_NUMBA = False
 
 
 # ---------------------------------------------------------------------------
 # 공통 유틸
 # ---------------------------------------------------------------------------
 
+@functools.lru_cache(maxsize=16)
+def _circle_stamp(R: int) -> np.ndarray:
+    """반지름 R 원의 (2R+1, 2R+1) boolean 스탬프. 모든 원은 이 패턴의
+    평행이동이므로 피크마다 거리 계산을 반복할 필요가 없습니다."""
+    q = np.arange(-R, R + 1) ** 2
+    return q[:, None] + q[None, :] <= R * R
+
+
+@functools.lru_cache(maxsize=16)
+def _ring_stamp(outer_r: int, inner_r: int) -> np.ndarray:
+    """outer_r 바깥 반지름, inner_r 안쪽 반지름의 링 boolean 스탬프."""
+    q = np.arange(-outer_r, outer_r + 1) ** 2
+    d2 = q[:, None] + q[None, :]
+    return (d2 <= outer_r * outer_r) & (d2 > inner_r * inner_r)
+
+
+@functools.lru_cache(maxsize=8)
+def _grids(H: int, W: int):
+    """(H, W)별 좌표 벡터 캐시 – 워크플로 내 스펙트럼 크기는 대개 고정이므로
+    빠른 미리보기 반복 실행에서 매번 arange를 재생성하지 않습니다."""
+    return np.arange(H), np.arange(W)
+
+
 def _to_gray(frame: np.ndarray) -> np.ndarray:
     """(H, W, C) float32 → (H, W) grayscale float32"""
     C = frame.shape[2]
@@ -26,32 +59,212 @@ def _to_gray(frame: np.ndarray) -> np.ndarray:
     return frame[:, :, 0]
 
 
-def _build_circular_mask(H: int, W: int, peaks, radius: int, feather: int) -> np.ndarray:
-    """피크 좌표 목록으로 0/1 마스크 생성. 1=노치(제거) 영역."""
-    mask = np.zeros((H, W), dtype=np.float32)
-    Y, X = np.ogrid[:H, :W]
-    for peak in peaks:
-        r, c = int(peak[0]), int(peak[1])
-        circle = (X - c) ** 2 + (Y - r) ** 2 <= radius ** 2
-        mask[circle] = 1.0
-    if feather > 0:
-        mask = gaussian_filter(mask, sigma=feather)
-        mask = np.clip(mask, 0.0, 1.0)
+if _HAS_NUMBA:
+    @numba.njit(parallel=True, cache=True, fastmath=True)
+    def _paint_circles_numba(mask, peaks_r, peaks_c, radii):
+        H, W = mask.shape
+        for p in numba.prange(len(peaks_r)):
+            r, c, R = peaks_r[p], peaks_c[p], radii[p]
+            r0, r1 = max(0, r - R), min(H, r + R + 1)
+            c0, c1 = max(0, c - R), min(W, c + R + 1)
+            for i in range(r0, r1):
+                for j in range(c0, c1):
+                    if (i - r) ** 2 + (j - c) ** 2 <= R * R:
+                        mask[i, j] = 1
+
+    @numba.njit(parallel=True, cache=True, fastmath=True)
+    def _apply_mask_numba(frame, mask, out):
+        H, W, C = frame.shape
+        for i in numba.prange(H):
+            for j in range(W):
+                m = 1.0 - mask[i, j]
+                for ch in range(C):
+                    out[i, j, ch] = frame[i, j, ch] * m
+
+
+@functools.lru_cache(maxsize=8)
+def _specialized_painter(R: int):
+    """반지름 R을 컴파일 타임 상수로 박아 특수화한 원 페인터를 생성/캐시.
+
+    같은 notch_radius로 여러 프레임을 처리하는 워크플로에서 루프 한계와
+    R*R 비교가 상수로 접혀 자동 벡터화에 유리합니다. numba가 없으면 None.
+    """
+    if not _HAS_NUMBA:
+        return None
+    R2 = R * R
+
+    # 클로저 상수를 쓰므로 디스크 캐시 대신 lru_cache가 컴파일 결과를 보관
+    @numba.njit(parallel=True, fastmath=True)
+    def _painter(mask, peaks_r, peaks_c):
+        H, W = mask.shape
+        for p in numba.prange(len(peaks_r)):
+            r, c = peaks_r[p], peaks_c[p]
+            r0, r1 = max(0, r - R), min(H, r + R + 1)
+            c0, c1 = max(0, c - R), min(W, c + R + 1)
+            for i in range(r0, r1):
+                for j in range(c0, c1):
+                    if (i - r) ** 2 + (j - c) ** 2 <= R2:
+                        mask[i, j] = 1
+
+    return _painter
+
+
+# 완전 벡터화 원 페인팅이 사용할 수 있는 (P,H,W) 임시 버퍼 상한 (바이트)
+_VECTOR_PAINT_BUDGET = 64 << 20
+
+
+def _paint_circles(mask: np.ndarray, peaks_r, peaks_c, radii) -> np.ndarray:
+    """(row, col, radius) 목록의 원을 mask에 1.0으로 페인트 (in-place).
+
+    numba가 있으면 피크 단위 병렬 JIT 커널, 없으면 피크 수에 따라
+    완전 벡터화 브로드캐스트 또는 바운딩 박스 numpy 루프를 선택.
+    """
+    n = len(peaks_r)
+    if n == 0:
+        return mask
+    # 행 순서로 정렬해 인접 반복이 가까운 캐시 라인에 기록하도록 함
+    # (nonzero 유래 좌표는 이미 행 순서이므로 그 경우 argsort는 항등)
+    rs64 = np.asarray(peaks_r, dtype=np.int64)
+    cs64 = np.asarray(peaks_c, dtype=np.int64)
+    rad64 = np.asarray(radii, dtype=np.int64)
+    order = np.argsort(rs64, kind="stable")
+    if not np.array_equal(order, np.arange(n)):
+        rs64, cs64, rad64 = rs64[order], cs64[order], rad64[order]
+    if _HAS_NUMBA:
+        # 반지름이 모두 같으면 R을 상수로 특수화한 커널로 디스패치
+        if np.all(rad64 == rad64[0]):
+            _specialized_painter(int(rad64[0]))(mask, rs64, cs64)
+        else:
+            _paint_circles_numba(mask, rs64, cs64, rad64)
+        return mask
+    H, W = mask.shape
+    # 피크가 많으면 Python 루프 오버헤드가 지배적 → (P,H,W) 브로드캐스트 한 방
+    if n >= 32 and n * H * W * 4 <= _VECTOR_PAINT_BUDGET:
+        py = rs64.astype(np.int32)[:, None, None]
+        px = cs64.astype(np.int32)[:, None, None]
+        pr = rad64.astype(np.int32)[:, None, None]
+        Yv = np.arange(H, dtype=np.int32)[None, :, None]
+        Xv = np.arange(W, dtype=np.int32)[None, None, :]
+        hit = ((Yv - py) ** 2 + (Xv - px) ** 2 <= pr * pr).any(axis=0)
+        np.maximum(mask, hit.astype(mask.dtype), out=mask)
+        return mask
+    for p in range(n):
+        r, c, R = int(rs64[p]), int(cs64[p]), int(rad64[p])
+        # 미리 계산한 원 스탬프를 바운딩 박스 슬라이스에 OR – memcpy+OR 수준
+        r0, r1 = max(0, r - R), min(H, r + R + 1)
+        c0, c1 = max(0, c - R), min(W, c + R + 1)
+        if r0 >= r1 or c0 >= c1:
+            continue
+        stamp = _circle_stamp(R)
+        sr0, sc0 = r0 - (r - R), c0 - (c - R)
+        np.logical_or(
+            mask[r0:r1, c0:c1],
+            stamp[sr0:sr0 + (r1 - r0), sc0:sc0 + (c1 - c0)],
+            out=mask[r0:r1, c0:c1],
+        )
+    return mask
+
+
+def _apply_mask(frame: np.ndarray, mask: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """filtered = frame * (1 - mask). numba가 있으면 행 단위 병렬 처리.
+
+    mask는 float32(feathered) 또는 uint8(하드 에지) 모두 허용.
+    out을 주면 (배치 출력 배열의 슬라이스 등) 그 버퍼에 바로 기록.
+    """
+    if out is None:
+        out = np.empty_like(frame)
+    if _HAS_NUMBA:
+        _apply_mask_numba(frame, mask, out)
+        return out
+    if mask.dtype == np.uint8:
+        # 하드 마스크는 float 캐스트 없이 bool 곱으로 바로 적용
+        np.multiply(frame, (mask == 0)[:, :, np.newaxis], out=out)
+    else:
+        np.multiply(frame, 1.0 - mask[:, :, np.newaxis], out=out)
+    return out
+
+
+def _local_max_map(gray: np.ndarray, k: int) -> np.ndarray:
+    """k×k 이웃에서 로컬 최댓값인 픽셀의 boolean 맵.
+
+    정사각 max 필터는 축별 1-D 두 번으로 분리 가능 – O(HW·k).
+    (vectorized_filter로 융합하는 대안은 전체 k×k 윈도를 구체화해
+    O(HW·k²)라 k가 조금만 커져도 수십 배 느려 채택하지 않음.)
+    """
+    nbhd = maximum_filter1d(maximum_filter1d(gray, k, axis=0), k, axis=1)
+    return gray == nbhd
+
+
+def _feather_mask(mask: np.ndarray, feather: int) -> np.ndarray:
+    """마스크 경계를 Gaussian sigma=feather로 부드럽게.
+
+    활성(비영) 영역의 바운딩 박스 + 3*sigma 패딩만 분리형 1-D 필터로
+    처리하여 전체 이미지 순회를 피합니다. uint8 하드 마스크는 feather>0일
+    때만 float32로 승격되어 반환되며, feather=0이면 그대로 돌려줍니다.
+    """
+    if feather <= 0:
+        return mask
+    H, W = mask.shape
+    ys, xs = np.nonzero(mask)
+    if ys.size == 0:
+        return mask.astype(np.float32, copy=False)
+    # 큰 sigma + 큰 이미지에서는 공간 도메인 O(HW*sigma)보다 주파수 도메인
+    # Gaussian 곱 O(HW log HW)이 싸다 (sigma와 무관). 단, 주파수 도메인
+    # 합성곱은 순환이라 경계 근처 노치의 feather가 반대편으로 감기므로
+    # 활성 영역이 모든 경계에서 4*sigma 이상 떨어진 경우에만 사용
+    # (그 밖에선 wrap 기여가 exp(-8) 수준이라 무시 가능)
+    margin = 4 * feather
+    if (
+        feather > 8
+        and H * W > 1_000_000
+        and int(ys.min()) >= margin and int(ys.max()) < H - margin
+        and int(xs.min()) >= margin and int(xs.max()) < W - margin
+    ):
+        Mf = np.fft.rfft2(mask.astype(np.float32, copy=False))
+        ky = np.fft.fftfreq(H)[:, None]
+        kx = np.fft.rfftfreq(W)[None, :]
+        G = np.exp(-2.0 * (np.pi * feather) ** 2 * (kx ** 2 + ky ** 2))
+        out = np.fft.irfft2(Mf * G, s=(H, W)).astype(np.float32)
+        np.clip(out, 0.0, 1.0, out=out)
+        return out
+    pad = 3 * feather
+    y0, y1 = max(0, int(ys.min()) - pad), min(H, int(ys.max()) + pad + 1)
+    x0, x1 = max(0, int(xs.min()) - pad), min(W, int(xs.max()) + pad + 1)
+    sub = gaussian_filter1d(mask[y0:y1, x0:x1].astype(np.float32, copy=False), feather, axis=0)
+    sub = gaussian_filter1d(sub, feather, axis=1)
+    np.clip(sub, 0.0, 1.0, out=sub)
+    out = np.zeros((H, W), dtype=np.float32)
+    out[y0:y1, x0:x1] = sub
+    return out
+
+
+def _build_circular_mask(H: int, W: int, rs, cs, radius: int, feather: int) -> np.ndarray:
+    """피크 좌표 배열(rs=행, cs=열)로 0/1 마스크 생성. 1=노치(제거) 영역.
+
+    feather=0이면 uint8 하드 마스크, feather>0이면 float32 반환.
+    """
+    mask = np.zeros((H, W), dtype=np.uint8)
+    _paint_circles(mask, rs, cs, np.full(len(rs), int(radius), dtype=np.int64))
+    mask = _feather_mask(mask, feather)
     return mask
 
 
 def _save_temp_image(frame: np.ndarray) -> dict:
     """(H, W, C) float32 [0,1] → temp PNG, ComfyUI /view 형식 dict 반환."""
-    img_u8 = (np.clip(frame, 0.0, 1.0) * 255).astype(np.uint8)
-    if img_u8.shape[2] == 1:
-        pil = Image.fromarray(img_u8[:, :, 0], mode="L").convert("RGB")
+    # 클립+스케일+캐스트를 미리 할당한 uint8 버퍼로 한 번에 처리
+    buf = np.empty(frame.shape, dtype=np.uint8)
+    np.clip(frame * 255.0, 0.0, 255.0, out=buf, casting="unsafe")
+    if buf.shape[2] == 1:
+        # /view는 그레이스케일 PNG도 처리하므로 RGB 변환 불필요
+        pil = Image.fromarray(buf[:, :, 0], mode="L")
     else:
-        pil = Image.fromarray(img_u8[:, :, :3])
+        pil = Image.fromarray(np.ascontiguousarray(buf[:, :, :3]))
     tmp = tempfile.NamedTemporaryFile(
         suffix=".png", prefix="notch_", delete=False,
         dir=os.path.join(tempfile.gettempdir())
     )
-    pil.save(tmp.name)
+    # 미리보기 용도이므로 가장 빠른 압축 레벨로 저장
+    pil.save(tmp.name, compress_level=1)
     tmp.close()
     return {
         "filename": os.path.basename(tmp.name),
@@ -60,36 +273,136 @@ def _save_temp_image(frame: np.ndarray) -> dict:
     }
 
 
-def _annotate_preview(frame: np.ndarray, peaks, radius: int, dc_r: int, H: int, W: int) -> np.ndarray:
+def _annotate_preview(frame: np.ndarray, rs, cs, radius: int, dc_r: int, H: int, W: int) -> np.ndarray:
     """스펙트럼 위에 검출된 피크를 노란색 링으로 표시한 미리보기 생성."""
-    preview = np.clip(frame.copy(), 0.0, 1.0)
+    # 표시용 출력이므로 fp16 버퍼에 바로 클립 – copy() 후 재기록 대비 대역폭 절반
+    preview = np.empty(frame.shape, dtype=np.float16)
+    np.clip(frame, 0.0, 1.0, out=preview, casting="unsafe")
     C = frame.shape[2]
-    Y, X = np.ogrid[:H, :W]
     cy, cx = H // 2, W // 2
 
-    # DC 보호 영역 – 파란 링
+    # DC 보호 영역 – 파란 링 (미리 계산한 링 스탬프를 바운딩 박스에 적용)
     if dc_r > 0:
-        outer = (X - cx) ** 2 + (Y - cy) ** 2 <= (dc_r + 1) ** 2
-        inner = (X - cx) ** 2 + (Y - cy) ** 2 <= (dc_r - 1) ** 2
-        ring = outer & ~inner
+        Rb = dc_r + 1
+        r0, r1 = max(0, cy - Rb), min(H, cy + Rb + 1)
+        c0, c1 = max(0, cx - Rb), min(W, cx + Rb + 1)
+        stamp = _ring_stamp(dc_r + 1, dc_r - 1)
+        sr0, sc0 = r0 - (cy - Rb), c0 - (cx - Rb)
+        ring = stamp[sr0:sr0 + (r1 - r0), sc0:sc0 + (c1 - c0)]
         if C >= 3:
-            preview[ring, 0] = 0.2
-            preview[ring, 1] = 0.5
-            preview[ring, 2] = 1.0
-
-    # 피크 – 노란 링
-    for peak in peaks:
-        r, c = int(peak[0]), int(peak[1])
-        outer = (X - c) ** 2 + (Y - r) ** 2 <= (radius + 2) ** 2
-        inner = (X - c) ** 2 + (Y - r) ** 2 <= max(0, radius - 1) ** 2
-        ring = outer & ~inner
+            sub = preview[r0:r1, c0:c1]
+            sub[ring, 0] = 0.2
+            sub[ring, 1] = 0.5
+            sub[ring, 2] = 1.0
+
+    # 피크 – 노란 링 (같은 반지름끼리 스탬프 공유)
+    peak_stamp = _ring_stamp(radius + 2, max(0, radius - 1))
+    Rb = radius + 2
+    for r, c in zip(np.asarray(rs).tolist(), np.asarray(cs).tolist()):
+        r0, r1 = max(0, r - Rb), min(H, r + Rb + 1)
+        c0, c1 = max(0, c - Rb), min(W, c + Rb + 1)
+        if r0 >= r1 or c0 >= c1:
+            continue
+        sr0, sc0 = r0 - (r - Rb), c0 - (c - Rb)
+        ring = peak_stamp[sr0:sr0 + (r1 - r0), sc0:sc0 + (c1 - c0)]
+        sub = preview[r0:r1, c0:c1]
+        if C >= 3:
+            sub[ring, 0] = 1.0
+            sub[ring, 1] = 0.9
+            sub[ring, 2] = 0.0
+        else:
+            sub[ring, 0] = 1.0
+    # fp16 버퍼 그대로 반환 – 호출부의 미리보기 출력 배열도 fp16
+    return preview
+
+
+# ---------------------------------------------------------------------------
+# torch 네이티브 경로 – 스펙트럼이 GPU에 있을 때 CPU 왕복 없이 처리
+# ---------------------------------------------------------------------------
+
+def _to_gray_t(frame: torch.Tensor) -> torch.Tensor:
+    """(H, W, C) float tensor → (H, W) grayscale, 입력과 같은 device 유지."""
+    if frame.shape[-1] >= 3:
+        return (
+            0.299 * frame[..., 0]
+            + 0.587 * frame[..., 1]
+            + 0.114 * frame[..., 2]
+        )
+    return frame[..., 0]
+
+
+def _feather_mask_t(mask: torch.Tensor, feather: int) -> torch.Tensor:
+    """(H, W) 마스크를 분리형 1-D conv 두 번으로 Gaussian 블러 (device 유지)."""
+    if feather <= 0:
+        return mask
+    H, W = mask.shape
+    # scipy gaussian_filter1d 기본(truncate=4.0)과 같은 커널 길이
+    # (이미지보다 커널이 커지는 비정상 입력은 패딩 가능 범위로 절단)
+    R = max(1, int(4.0 * feather + 0.5))
+    R = min(R, H - 1, W - 1)
+    x = torch.arange(-R, R + 1, device=mask.device, dtype=mask.dtype)
+    kernel = torch.exp(-0.5 * (x / feather) ** 2)
+    kernel = kernel / kernel.sum()
+    # CPU 경로(scipy mode='reflect', 엣지 포함 대칭)와 경계 결과가 일치하도록
+    # zero padding 대신 수동 대칭 패딩 후 padding=0으로 합성곱
+    m = mask[None, None]
+    m = torch.cat([m[..., :R, :].flip(-2), m, m[..., -R:, :].flip(-2)], dim=-2)
+    m = F.conv2d(m, kernel.view(1, 1, -1, 1))
+    m = torch.cat([m[..., :R].flip(-1), m, m[..., -R:].flip(-1)], dim=-1)
+    m = F.conv2d(m, kernel.view(1, 1, 1, -1))
+    return m[0, 0].clamp_(0.0, 1.0)
+
+
+def _build_circular_mask_t(
+    H: int, W: int, peaks, radii, feather: int,
+    device: torch.device, dtype: torch.dtype = torch.float32,
+) -> torch.Tensor:
+    """피크별 바운딩 박스에만 원을 그려 (H, W) 마스크 생성. device 유지."""
+    mask = torch.zeros((H, W), device=device, dtype=dtype)
+    for (r, c), rad in zip(peaks, radii):
+        R = int(rad)
+        r0, r1 = max(0, r - R), min(H, r + R + 1)
+        c0, c1 = max(0, c - R), min(W, c + R + 1)
+        if r0 >= r1 or c0 >= c1:
+            continue
+        yy = (torch.arange(r0, r1, device=device) - r)[:, None] ** 2
+        xx = (torch.arange(c0, c1, device=device) - c)[None, :] ** 2
+        sub = mask[r0:r1, c0:c1]
+        torch.maximum(sub, (yy + xx <= R * R).to(dtype), out=sub)
+    return _feather_mask_t(mask, feather)
+
+
+def _annotate_preview_t(
+    frame: torch.Tensor, peaks, radius: int, dc_r: int, H: int, W: int,
+) -> torch.Tensor:
+    """_annotate_preview의 torch 버전 – 링을 바운딩 박스 단위로 기록."""
+    preview = frame.clamp(0.0, 1.0)
+    C = frame.shape[-1]
+    device = frame.device
+    cy, cx = H // 2, W // 2
+
+    def _draw_ring(r, c, outer_r, inner_r, color):
+        Rb = outer_r
+        r0, r1 = max(0, r - Rb), min(H, r + Rb + 1)
+        c0, c1 = max(0, c - Rb), min(W, c + Rb + 1)
+        if r0 >= r1 or c0 >= c1:
+            return
+        yy = (torch.arange(r0, r1, device=device) - r)[:, None] ** 2
+        xx = (torch.arange(c0, c1, device=device) - c)[None, :] ** 2
+        d2 = yy + xx
+        ring = (d2 <= outer_r * outer_r) & (d2 > inner_r * inner_r)
+        sub = preview[r0:r1, c0:c1]
         if C >= 3:
-            preview[ring, 0] = 1.0
-            preview[ring, 1] = 0.9
-            preview[ring, 2] = 0.0
+            for ch, v in enumerate(color):
+                sub[..., ch][ring] = v
         else:
-            preview[ring, 0] = 1.0
-    return preview.astype(np.float32)
+            sub[..., 0][ring] = color[0]
+
+    if dc_r > 0 and C >= 3:
+        _draw_ring(cy, cx, dc_r + 1, max(0, dc_r - 1), (0.2, 0.5, 1.0))
+    for r, c in peaks:
+        _draw_ring(r, c, radius + 2, max(0, radius - 1), (1.0, 0.9, 0.0))
+    return preview
 
 
 # ---------------------------------------------------------------------------
@@ -177,50 +490,115 @@ class SpectrumNotchAutoNode:
     )
 
     def apply_notch(self, spectrum, threshold_rel, min_distance, notch_radius, protect_dc, feather):
+        # GPU 텐서는 CPU 왕복 없이 torch 네이티브 경로로 처리
+        if spectrum.device.type != "cpu":
+            return self._apply_notch_torch(
+                spectrum, threshold_rel, min_distance, notch_radius, protect_dc, feather
+            )
+
         img_np = spectrum.cpu().numpy().astype(np.float32)
         # (B,H,W) 그레이스케일 텐서도 허용 → (B,H,W,1)로 정규화
         if img_np.ndim == 3:
             img_np = img_np[:, :, :, np.newaxis]
         B, H, W, C = img_np.shape
 
-        out_filtered, out_mask, out_preview = [], [], []
+        out_filtered = np.empty((B, H, W, C), dtype=np.float32)
+        # 마스크/미리보기는 표시 전용 → fp16으로 전달해 메모리·전송량 절반
+        out_mask = np.empty((B, H, W, 3), dtype=np.float16)
+        out_preview = np.empty((B, H, W, C), dtype=np.float16)
         all_peaks = []
 
+        # DC 보호 영역은 배치 전체에 동일 – 루프 밖에서 한 번만 계산
+        cy, cx = H // 2, W // 2
+        dc_zone = None
+        if protect_dc > 0:
+            Yv, Xv = _grids(H, W)
+            dc_zone = (Xv[None, :] - cx) ** 2 + (Yv[:, None] - cy) ** 2 <= protect_dc ** 2
+
         for b in range(B):
             frame = img_np[b]
             gray = _to_gray(frame)
 
             # 로컬 최댓값 검출
-            nbhd = maximum_filter(gray, size=max(3, min_distance * 2 + 1))
-            local_max = (gray == nbhd) & (gray >= threshold_rel * gray.max())
+            k = max(3, min_distance * 2 + 1)
+            local_max = _local_max_map(gray, k) & (gray >= threshold_rel * gray.max())
 
             # DC 보호 영역 제외
-            cy, cx = H // 2, W // 2
-            Ym, Xm = np.ogrid[:H, :W]
-            if protect_dc > 0:
-                local_max[(Xm - cx) ** 2 + (Ym - cy) ** 2 <= protect_dc ** 2] = False
+            if dc_zone is not None:
+                local_max[dc_zone] = False
 
-            peaks = np.argwhere(local_max).tolist()  # [[row, col], ...]
+            # argwhere+tolist 대신 nonzero – 전치/리스트 변환 없이 배열 그대로 사용
+            rs, cs = np.nonzero(local_max)
 
-            # 마스크 생성 및 적용
-            mask = _build_circular_mask(H, W, peaks, notch_radius, feather)
-            filtered = frame * (1.0 - mask[:, :, np.newaxis])
+            # 마스크 생성 및 적용 – 미리 할당한 출력 배열에 바로 기록
+            mask = _build_circular_mask(H, W, rs, cs, notch_radius, feather)
+            _apply_mask(frame, mask, out=out_filtered[b])
 
-            # 마스크 이미지 (3채널 흰색/검정)
-            mask_img = np.stack([mask, mask, mask], axis=-1)
+            # 마스크 이미지 (3채널 흰색/검정) – 채널 복제는 브로드캐스트 대입으로
+            out_mask[b] = mask.astype(np.float32, copy=False)[..., None]
 
-            # 어노테이션 미리보기
-            preview = _annotate_preview(frame, peaks, notch_radius, protect_dc, H, W)
+            # 어노테이션 미리보기 (fp16 버퍼 그대로 기록)
+            out_preview[b] = _annotate_preview(frame, rs, cs, notch_radius, protect_dc, H, W)
 
-            out_filtered.append(filtered)
-            out_mask.append(mask_img)
-            out_preview.append(preview)
             if b == 0:
-                all_peaks = [{"x": int(p[1]), "y": int(p[0]), "r": notch_radius} for p in peaks]
+                all_peaks = [
+                    {"x": c, "y": r, "r": notch_radius}
+                    for r, c in zip(rs.tolist(), cs.tolist())
+                ]
+
+        # from_numpy는 zero-copy – stack/astype 왕복 없음
+        t_filtered = torch.from_numpy(out_filtered)
+        t_mask = torch.from_numpy(out_mask)
+        t_preview = torch.from_numpy(out_preview)
+
+        return (t_filtered, t_mask, t_preview, json.dumps(all_peaks))
+
+    def _apply_notch_torch(self, spectrum, threshold_rel, min_distance, notch_radius, protect_dc, feather):
+        """spectrum.device에서 전 과정을 수행하는 torch 네이티브 구현."""
+        img = spectrum.float()
+        if img.dim() == 3:
+            img = img.unsqueeze(-1)
+        B, H, W, C = img.shape
+        device = img.device
+
+        k = max(3, min_distance * 2 + 1)
+        cy, cx = H // 2, W // 2
+        dc_zone = None
+        if protect_dc > 0:
+            yv = torch.arange(H, device=device)
+            xv = torch.arange(W, device=device)
+            dc_zone = (
+                (xv[None, :] - cx) ** 2 + (yv[:, None] - cy) ** 2
+                <= protect_dc ** 2
+            )
+
+        # 검출 단계는 배치 전체를 한 번에 처리
+        gray = _to_gray_t(img)  # (B, H, W)
+        nbhd = F.max_pool2d(gray[:, None], k, stride=1, padding=k // 2)[:, 0]
+        thr = threshold_rel * gray.reshape(B, -1).amax(1)[:, None, None]
+        local_max = (gray == nbhd) & (gray >= thr)
+        if dc_zone is not None:
+            local_max &= ~dc_zone  # (H, W) → 배치 브로드캐스트
+
+        t_filtered = torch.empty_like(img)
+        # 마스크/미리보기는 표시 전용 → fp16으로 전달해 메모리·전송량 절반
+        t_mask = torch.empty((B, H, W, 3), device=device, dtype=torch.float16)
+        t_preview = torch.empty(img.shape, device=device, dtype=torch.float16)
+        all_peaks = []
 
-        t_filtered = torch.from_numpy(np.stack(out_filtered).astype(np.float32))
-        t_mask = torch.from_numpy(np.stack(out_mask).astype(np.float32))
-        t_preview = torch.from_numpy(np.stack(out_preview).astype(np.float32))
+        # 피크는 프레임마다 다르므로 마스크 생성만 배치 루프 유지
+        for b in range(B):
+            # 피크 수는 적으므로 좌표만 host로 가져와 바운딩 박스 슬라이싱에 사용
+            peaks = [(int(r), int(c)) for r, c in torch.nonzero(local_max[b]).tolist()]
+
+            mask = _build_circular_mask_t(
+                H, W, peaks, [notch_radius] * len(peaks), feather, device
+            )
+            t_filtered[b] = img[b] * (1.0 - mask[:, :, None])
+            t_mask[b] = mask[:, :, None]
+            t_preview[b] = _annotate_preview_t(img[b], peaks, notch_radius, protect_dc, H, W)
+            if b == 0:
+                all_peaks = [{"x": c, "y": r, "r": notch_radius} for r, c in peaks]
 
         return (t_filtered, t_mask, t_preview, json.dumps(all_peaks))
 
@@ -291,46 +669,45 @@ class SpectrumNotchManualNode:
         except Exception:
             points = []
 
+        # GPU 텐서는 CPU 왕복 없이 torch 네이티브 경로로 처리
+        if spectrum.device.type != "cpu":
+            return self._apply_manual_notch_torch(spectrum, points, feather, protect_dc)
+
         img_np = spectrum.cpu().numpy().astype(np.float32)
         # (B,H,W) 그레이스케일 텐서도 허용 → (B,H,W,1)로 정규화
         if img_np.ndim == 3:
             img_np = img_np[:, :, :, np.newaxis]
         B, H, W, C = img_np.shape
 
-        out_filtered, out_mask = [], []
         cy, cx = H // 2, W // 2
-        Ym, Xm = np.ogrid[:H, :W]
 
+        # 포인트 파싱은 배치와 무관 – 루프 밖에서 한 번만 typed array로 변환
+        n_pts = len(points) + (1 if protect_dc > 0 else 0)
+        pts = np.empty((n_pts, 3), dtype=np.int32)
+        for i, p in enumerate(points):
+            pts[i] = (int(p.get("y", 0)), int(p.get("x", 0)), int(p.get("r", 8)))
+        # DC 보호 영역도 같은 원 페인터로 처리
+        if protect_dc > 0:
+            pts[-1] = (cy, cx, int(protect_dc))
+        rs, cs, radii = pts[:, 0], pts[:, 1], pts[:, 2]
+
+        # 마스크도 프레임과 무관하므로 배치 전체에 한 번만 생성
+        mask = np.zeros((H, W), dtype=np.uint8)
+        _paint_circles(mask, rs, cs, radii)
+        mask = _feather_mask(mask, feather)
+        mask_f = mask.astype(np.float32, copy=False)
+
+        # 미리 할당한 출력 배열에 프레임별 결과를 바로 기록
+        # (마스크는 표시 전용이므로 fp16)
+        out_filtered = np.empty((B, H, W, C), dtype=np.float32)
+        out_mask = np.empty((B, H, W, 3), dtype=np.float16)
         for b in range(B):
-            frame = img_np[b]
-
-            # 포인트 목록을 (row, col, radius) 형식으로 변환
-            peaks = [(int(p.get("y", 0)), int(p.get("x", 0))) for p in points]
-            radii = [int(p.get("r", 8)) for p in points]
-
-            # 마스크 생성
-            mask = np.zeros((H, W), dtype=np.float32)
-            for (r, c), rad in zip(peaks, radii):
-                circle = (Xm - c) ** 2 + (Ym - r) ** 2 <= rad ** 2
-                mask[circle] = 1.0
-
-            # DC 보호 영역 마스킹
-            if protect_dc > 0:
-                dc_zone = (Xm - cx) ** 2 + (Ym - cy) ** 2 <= protect_dc ** 2
-                mask[dc_zone] = 1.0
-
-            if feather > 0:
-                mask = gaussian_filter(mask, sigma=feather)
-                mask = np.clip(mask, 0.0, 1.0)
+            _apply_mask(img_np[b], mask, out=out_filtered[b])
+            out_mask[b] = mask_f[..., None]
 
-            filtered = frame * (1.0 - mask[:, :, np.newaxis])
-            mask_img = np.stack([mask, mask, mask], axis=-1)
-
-            out_filtered.append(filtered)
-            out_mask.append(mask_img)
-
-        t_filtered = torch.from_numpy(np.stack(out_filtered).astype(np.float32))
-        t_mask = torch.from_numpy(np.stack(out_mask).astype(np.float32))
+        # from_numpy는 zero-copy – stack/astype 왕복 없음
+        t_filtered = torch.from_numpy(out_filtered)
+        t_mask = torch.from_numpy(out_mask)
 
         # 첫 번째 프레임을 temp PNG로 저장 → JS 캔버스 배경으로 사용
         # (INPUT 스펙트럼을 저장하여 노치 편집의 기준 이미지로 활용)
@@ -341,6 +718,35 @@ class SpectrumNotchManualNode:
             "result": (t_filtered, t_mask),
         }
 
+    def _apply_manual_notch_torch(self, spectrum, points, feather, protect_dc):
+        """spectrum.device에서 전 과정을 수행하는 torch 네이티브 구현."""
+        img = spectrum.float()
+        if img.dim() == 3:
+            img = img.unsqueeze(-1)
+        B, H, W, C = img.shape
+        device = img.device
+
+        peaks = [(int(p.get("y", 0)), int(p.get("x", 0))) for p in points]
+        radii = [int(p.get("r", 8)) for p in points]
+        # DC 보호 영역도 같은 원 페인터로 처리
+        if protect_dc > 0:
+            peaks.append((H // 2, W // 2))
+            radii.append(int(protect_dc))
+
+        # 마스크는 프레임과 무관하므로 배치 전체에 한 번만 생성
+        mask = _build_circular_mask_t(H, W, peaks, radii, feather, device)
+        t_filtered = img * (1.0 - mask[None, :, :, None])
+        # 표시 전용 마스크는 fp16으로 캐스트 후 zero-copy 확장
+        t_mask = mask.to(torch.float16)[None, :, :, None].expand(B, -1, -1, 3)
+
+        # 캔버스 배경 PNG는 첫 프레임만 host로 복사하여 저장
+        preview_info = _save_temp_image(img[0].cpu().numpy())
+
+        return {
+            "ui": {"images": [preview_info]},
+            "result": (t_filtered, t_mask),
+        }
+
 
 # ---------------------------------------------------------------------------
 # 노드 등록